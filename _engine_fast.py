@@ -0,0 +1,118 @@
+"""
+Step loop of GraphEngine._execute_run(), kept in its own module so it can be
+compiled ahead of time with mypyc, run from the directory containing app/
+(app/__init__.py must exist so mypyc names the module app._engine_fast):
+
+    mypyc app/_engine_fast.py
+
+The compiled extension is written next to this file, shadows it on import
+and runs the same code with native locals and direct dict calls; tools are
+still called as ordinary Python functions. Without it, this module runs as
+plain Python.
+
+Engine objects are typed as Any so this module does not import engine.py.
+"""
+
+from typing import Any, Callable, Dict, Final, Optional, Tuple
+
+# CompiledEdge.kind
+EDGE_NEXT: Final = 0
+EDGE_CONDITIONAL: Final = 1
+EDGE_FANOUT: Final = 2
+
+ToolFunc = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+def run_loop(engine: Any, graph: Any, run: Any, max_steps: int) -> None:
+    """
+    Execute graph from its start node, updating run.state and run.log in
+    place. Stops at an 'end' transition or after max_steps steps.
+
+    The log mode is resolved here, once: runs that log nothing use a loop
+    without the logging call instead of checking the mode on every step.
+    """
+    log_step = run.step_logger()
+    if log_step is None:
+        _run_unlogged(engine, graph, run, max_steps)
+    else:
+        _run_logged(engine, graph, run, max_steps, log_step)
+
+
+def _run_logged(
+    engine: Any,
+    graph: Any,
+    run: Any,
+    max_steps: int,
+    log_step: Callable[[str, Dict[str, Any]], None],
+) -> None:
+    tools: Dict[str, ToolFunc] = graph.compiled_tools
+    memo_keys: Dict[str, Optional[Tuple[str, ...]]] = graph.memo_keys
+    edges: Dict[str, Any] = graph.compiled_edges
+    state: Dict[str, Any] = run.state
+    call_tool = engine._call_tool
+
+    current: Optional[str] = graph.start_node
+    steps = 0
+
+    while current and steps < max_steps:
+        run.current_node = current
+
+        # Execute node
+        keys = memo_keys[current]
+        new_state: Dict[str, Any]
+        if keys is None:
+            new_state = tools[current](state) or {}
+        else:
+            new_state = call_tool(tools[current], current, keys, state)
+        # Merge new keys into shared state
+        state.update(new_state)
+
+        log_step(current, new_state)
+
+        # Decide next node
+        edge = edges[current]
+        if edge.kind == EDGE_CONDITIONAL:
+            current = edge.on_true if state.get(edge.condition_key) else edge.on_false
+        else:
+            if edge.fanout:
+                engine._run_fanout(graph, run, edge.fanout)
+            current = edge.next_node
+
+        if current is None:
+            break
+        steps += 1
+
+
+def _run_unlogged(engine: Any, graph: Any, run: Any, max_steps: int) -> None:
+    # Same as _run_logged() minus the log_step() call; keep the two in sync.
+    tools: Dict[str, ToolFunc] = graph.compiled_tools
+    memo_keys: Dict[str, Optional[Tuple[str, ...]]] = graph.memo_keys
+    edges: Dict[str, Any] = graph.compiled_edges
+    state: Dict[str, Any] = run.state
+    call_tool = engine._call_tool
+
+    current: Optional[str] = graph.start_node
+    steps = 0
+
+    while current and steps < max_steps:
+        run.current_node = current
+
+        keys = memo_keys[current]
+        new_state: Dict[str, Any]
+        if keys is None:
+            new_state = tools[current](state) or {}
+        else:
+            new_state = call_tool(tools[current], current, keys, state)
+        state.update(new_state)
+
+        edge = edges[current]
+        if edge.kind == EDGE_CONDITIONAL:
+            current = edge.on_true if state.get(edge.condition_key) else edge.on_false
+        else:
+            if edge.fanout:
+                engine._run_fanout(graph, run, edge.fanout)
+            current = edge.next_node
+
+        if current is None:
+            break
+        steps += 1
@@ -1,60 +1,255 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
-from uuid import uuid4
+import asyncio
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Set, Tuple, TypeVar
 
-from .models import NodeLogEntry
+import orjson
+
+from ._engine_fast import EDGE_CONDITIONAL, EDGE_FANOUT, EDGE_NEXT, run_loop
 
 
 ToolFunc = Callable[[Dict[str, Any]], Dict[str, Any]]
 
+LOG_MODES = ("none", "delta", "full")
+StepLogger = Callable[[str, Dict[str, Any]], None]
+
+
+def _new_id() -> str:
+    # Graph/run ids double as access tokens (the API has no auth), so they
+    # must stay unguessable: 64 random bits, ~4x cheaper than str(uuid4()).
+    return secrets.token_hex(8)
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
 
-@dataclass
+class LRUDict(OrderedDict[K, V]):
+    """
+    Dict capped at maxsize entries; inserting past the cap evicts the least
+    recently used entry. Use lookup() for reads that should count as a use.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        # Runs execute on worker threads, so updates must not interleave
+        self._lock = threading.Lock()
+
+    def __setitem__(self, key: K, value: V) -> None:
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > self.maxsize:
+                self.popitem(last=False)
+
+    def lookup(self, key: K) -> Optional[V]:
+        with self._lock:
+            value = self.get(key)
+            if value is not None:
+                self.move_to_end(key)
+            return value
+
+
+@dataclass(slots=True)
+class CompiledEdge:
+    """
+    Pre-resolved transition out of a node. 'end' is normalized to None.
+    """
+    kind: int
+    next_node: Optional[str] = None
+    condition_key: Optional[str] = None
+    on_true: Optional[str] = None
+    on_false: Optional[str] = None
+    fanout: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
 class Graph:
     graph_id: str
     nodes: List[str]
     start_node: str
     edges: Dict[str, Dict[str, Any]]  # flexible edge definition
+    # Filled by GraphEngine._compile_graph(), keyed by node name
+    compiled_edges: Dict[str, CompiledEdge] = field(default_factory=dict)
+    compiled_tools: Dict[str, ToolFunc] = field(default_factory=dict)
+    memo_keys: Dict[str, Optional[Tuple[str, ...]]] = field(default_factory=dict)
+    cacheable: bool = True
+
+
+@dataclass(slots=True)
+class NodeLogEntry:
+    """
+    One executed step. delta holds only the keys the node wrote; state is
+    the full snapshot, kept in "full" log mode only. The API converts
+    entries to models.NodeLogEntry snapshots at the boundary.
+    """
+    node: str
+    delta: Dict[str, Any]
+    state: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RunRecord:
     run_id: str
     graph_id: str
     status: str  # "running" | "completed" | "error"
     current_node: Optional[str]
     state: Dict[str, Any] = field(default_factory=dict)
-    log: List[NodeLogEntry] = field(default_factory=list)
+    # Fold base of the "delta" log; left empty in the other log modes
+    initial_state: Dict[str, Any] = field(default_factory=dict)
+    # Bounded by maxlen: only the most recent steps are kept
+    log: Deque[NodeLogEntry] = field(default_factory=deque)
+    # State before the oldest kept log entry; None means initial_state
+    log_base: Optional[Dict[str, Any]] = None
+    log_mode: str = "delta"  # one of LOG_MODES
     error_message: Optional[str] = None
 
+    def step_logger(self) -> Optional[StepLogger]:
+        """
+        The log_step()/log_snapshot() method matching log_mode, or None when
+        nothing is logged. Resolved once per run, not per step.
+        """
+        if self.log_mode == "none":
+            return None
+        return self.log_snapshot if self.log_mode == "full" else self.log_step
+
+    def log_step(self, node: str, delta: Dict[str, Any]) -> None:
+        if delta is self.state:
+            # Tool returned the live state: log what it holds now
+            delta = delta.copy()
+        if self.log.maxlen and len(self.log) == self.log.maxlen:
+            evicted = self.log.popleft()
+            if self.log_base is None:
+                self.log_base = self.initial_state.copy()
+            self.log_base.update(evicted.delta)
+        self.log.append(NodeLogEntry(node, delta))
+
+    def log_snapshot(self, node: str, delta: Dict[str, Any]) -> None:
+        # Entries carry their own state, so evicting the oldest needs no fold
+        self.log.append(NodeLogEntry(node, delta, self.state.copy()))
+
+    def log_snapshots(self) -> List[Dict[str, Any]]:
+        """
+        Full state after each logged step. In "delta" mode they are rebuilt
+        by folding the deltas over log_base.
+        """
+        if self.log_mode == "full":
+            return [{"node": entry.node, "state": entry.state} for entry in self.log]
+
+        state = dict(self.initial_state if self.log_base is None else self.log_base)
+        snapshots: List[Dict[str, Any]] = []
+        for entry in self.log:
+            state.update(entry.delta)
+            snapshots.append({"node": entry.node, "state": dict(state)})
+        return snapshots
+
 
 class ToolRegistry:
     """
     Simple tool registry: node_name -> Python function
+
+    Tools are assumed to be pure functions of the state that return the
+    keys they write. In-place writes to the state argument are not
+    supported: they reach run.state, but the "delta" log only records
+    returned keys. Returning the state dict itself works, but such an
+    output is never memoized.
+
+    Register a tool with cacheable=False (or set ``func.cacheable = False``)
+    if its output can differ for the same input; graphs using it are never
+    memoized.
+
+    input_keys declares the state keys a tool reads. Tools that declare them
+    are memoized per node on those keys, see GraphEngine._call_tool(), and
+    must return only the keys they write: a cached output is replayed into
+    any later state that matches on input_keys.
+
+    Call seal() once every tool is registered: compiled graphs and the
+    engine caches assume a tool never changes after that.
     """
 
     def __init__(self) -> None:
         self._tools: Dict[str, ToolFunc] = {}
+        self._non_cacheable: Set[str] = set()
+        self._input_keys: Dict[str, Tuple[str, ...]] = {}
+        self._sealed = False
+        # Read-only live view of the registered tools
+        self.tools: Mapping[str, ToolFunc] = MappingProxyType(self._tools)
 
-    def register(self, name: str, func: ToolFunc) -> None:
+    def register(
+        self,
+        name: str,
+        func: ToolFunc,
+        cacheable: Optional[bool] = None,
+        input_keys: Optional[Sequence[str]] = None,
+    ) -> None:
+        if self._sealed:
+            raise RuntimeError(f"Cannot register '{name}': tool registry is sealed")
+        if cacheable is None:
+            cacheable = getattr(func, "cacheable", True)
         self._tools[name] = func
+        if input_keys is None:
+            self._input_keys.pop(name, None)
+        else:
+            self._input_keys[name] = tuple(input_keys)
+        if cacheable:
+            self._non_cacheable.discard(name)
+        else:
+            self._non_cacheable.add(name)
+
+    def seal(self) -> None:
+        self._sealed = True
 
     def get(self, name: str) -> ToolFunc:
         if name not in self._tools:
             raise KeyError(f"Tool '{name}' is not registered")
         return self._tools[name]
 
+    def is_cacheable(self, name: str) -> bool:
+        return name in self._tools and name not in self._non_cacheable
+
+    def input_keys(self, name: str) -> Optional[Tuple[str, ...]]:
+        return self._input_keys.get(name)
+
 
 class GraphEngine:
     """
     In-memory graph + run engine.
+
+    If an executor is set, fan-out branches run on it concurrently. The
+    tools are submitted directly, so with a ProcessPoolExecutor they must
+    be picklable (module-level functions and JSON-like state).
     """
 
-    def __init__(self, tool_registry: ToolRegistry) -> None:
+    def __init__(
+        self,
+        tool_registry: ToolRegistry,
+        executor: Optional[Executor] = None,
+        max_graphs: int = 1_000,
+        max_runs: int = 10_000,
+        max_cached_runs: int = 1_000,
+        max_cached_nodes: int = 10_000,
+        max_log_entries: int = 100,
+    ) -> None:
         self.tool_registry = tool_registry
-        self.graphs: Dict[str, Graph] = {}
-        self.runs: Dict[str, RunRecord] = {}
+        self.executor = executor
+        self.max_log_entries = max_log_entries
+        # All stores are LRU-bounded so memory stays flat under load
+        self.graphs: LRUDict[str, Graph] = LRUDict(max_graphs)
+        self.runs: LRUDict[str, RunRecord] = LRUDict(max_runs)
+        # run signature -> completed run, see _run_signature()
+        self._run_cache: LRUDict[str, RunRecord] = LRUDict(max_cached_runs)
+        # (node, hash of its input keys) -> tool output, see _call_tool()
+        self._node_cache: LRUDict[Tuple[str, bytes], Dict[str, Any]] = LRUDict(max_cached_nodes)
+        # run signature -> execution shared by concurrent arun_graph() calls
+        self._in_flight: Dict[str, asyncio.Future[RunRecord]] = {}
 
     # -------- Graph management --------
 
@@ -67,31 +262,160 @@ class GraphEngine:
         if start_node not in nodes:
             raise ValueError("start_node must be one of the nodes")
 
-        graph_id = str(uuid4())
+        graph_id = _new_id()
         graph = Graph(
             graph_id=graph_id,
             nodes=nodes,
             start_node=start_node,
             edges=edges,
         )
+        self._compile_graph(graph)
         self.graphs[graph_id] = graph
         return graph_id
 
+    def _compile_graph(self, graph: Graph) -> None:
+        """
+        Resolve tools and edges once so the run loop does no registry
+        lookups or edge parsing. Raises ValueError for unknown tools or
+        edge targets.
+        """
+        for node in graph.nodes:
+            try:
+                graph.compiled_tools[node] = self.tool_registry.get(node)
+            except KeyError as exc:
+                raise ValueError(exc.args[0]) from exc
+
+            cacheable = self.tool_registry.is_cacheable(node)
+            graph.cacheable = graph.cacheable and cacheable
+            graph.memo_keys[node] = self.tool_registry.input_keys(node) if cacheable else None
+
+            graph.compiled_edges[node] = self._compile_edge(graph, node, graph.edges.get(node) or {})
+
+    @staticmethod
+    def _compile_edge(graph: Graph, node: str, edge_cfg: Dict[str, Any]) -> CompiledEdge:
+        def target(key: str) -> Optional[str]:
+            name = edge_cfg.get(key)
+            if not name or name == "end":
+                return None
+            if name not in graph.nodes:
+                raise ValueError(f"Edge '{node}.{key}' points to unknown node '{name}'")
+            return name
+
+        condition_key = edge_cfg.get("condition_key")
+        if condition_key is not None:
+            for key in ("on_true", "on_false"):
+                if key not in edge_cfg:
+                    raise ValueError(f"Conditional edge of '{node}' is missing '{key}'")
+            return CompiledEdge(
+                kind=EDGE_CONDITIONAL,
+                condition_key=condition_key,
+                on_true=target("on_true"),
+                on_false=target("on_false"),
+            )
+
+        fanout = edge_cfg.get("fanout")
+        if fanout is not None:
+            if not isinstance(fanout, list) or not fanout:
+                raise ValueError(f"Fan-out edge of '{node}' must list at least one node")
+            for name in fanout:
+                if name not in graph.nodes:
+                    raise ValueError(f"Edge '{node}.fanout' points to unknown node '{name}'")
+            if len(set(fanout)) != len(fanout):
+                raise ValueError(f"Fan-out edge of '{node}' lists a node twice")
+            return CompiledEdge(kind=EDGE_FANOUT, next_node=target("next"), fanout=tuple(fanout))
+
+        return CompiledEdge(kind=EDGE_NEXT, next_node=target("next"))
+
     # -------- Execution --------
 
-    def run_graph(self, graph_id: str, initial_state: Dict[str, Any]) -> RunRecord:
-        if graph_id not in self.graphs:
+    def run_graph(
+        self,
+        graph_id: str,
+        initial_state: Dict[str, Any],
+        log_mode: str = "delta",
+    ) -> RunRecord:
+        """
+        Execute a graph. log_mode picks what run.log keeps: "none", "delta"
+        (keys written per step) or "full" (state snapshot per step).
+        """
+        self._check_log_mode(log_mode)
+        graph = self._get_graph(graph_id)
+        signature = self._run_signature(graph, initial_state, log_mode)
+        return self._run_graph(graph, initial_state, log_mode, signature)
+
+    async def arun_graph(
+        self,
+        graph_id: str,
+        initial_state: Dict[str, Any],
+        log_mode: str = "delta",
+    ) -> RunRecord:
+        """
+        run_graph() for async callers: the run executes in the loop's default
+        executor. Concurrent calls with the same signature share a single
+        execution; each caller still gets a run of its own.
+        """
+        self._check_log_mode(log_mode)
+        graph = self._get_graph(graph_id)
+        signature = self._run_signature(graph, initial_state, log_mode)
+        loop = asyncio.get_running_loop()
+        if signature is None:
+            return await loop.run_in_executor(None, self._run_graph, graph, initial_state, log_mode, None)
+        cached = self._run_cache.lookup(signature)
+        if cached is not None:
+            return self._reuse_run(cached)
+
+        shared = self._in_flight.get(signature)
+        if shared is not None:
+            return self._reuse_run(await asyncio.shield(shared))
+
+        shared = loop.run_in_executor(None, self._run_graph, graph, initial_state, log_mode, signature)
+        self._in_flight[signature] = shared
+
+        def _done(future: asyncio.Future[RunRecord]) -> None:
+            if self._in_flight.get(signature) is future:
+                del self._in_flight[signature]
+
+        shared.add_done_callback(_done)
+        return await asyncio.shield(shared)
+
+    @staticmethod
+    def _check_log_mode(log_mode: str) -> None:
+        if log_mode not in LOG_MODES:
+            raise ValueError(f"log_mode must be one of {LOG_MODES}, got '{log_mode}'")
+
+    def _get_graph(self, graph_id: str) -> Graph:
+        graph = self.graphs.lookup(graph_id)
+        if graph is None:
             raise KeyError(f"Graph '{graph_id}' not found")
+        return graph
 
-        graph = self.graphs[graph_id]
-        run_id = str(uuid4())
+    def _run_graph(
+        self,
+        graph: Graph,
+        initial_state: Dict[str, Any],
+        log_mode: str,
+        signature: Optional[str],
+    ) -> RunRecord:
+        if signature is not None:
+            cached = self._run_cache.lookup(signature)
+            if cached is not None:
+                return self._reuse_run(cached)
+
+        graph_id = graph.graph_id
+
+        run_id = _new_id()
         run = RunRecord(
             run_id=run_id,
             graph_id=graph_id,
             status="running",
             current_node=graph.start_node,
-            state=dict(initial_state),
-            log=[],
+            # Shallow copies: only the key references are duplicated, never
+            # the values. The "delta" fold base gets its own copy so it does
+            # not follow later changes to the caller's dict.
+            state=initial_state.copy(),
+            initial_state=initial_state.copy() if log_mode == "delta" else {},
+            log=deque(maxlen=self.max_log_entries),
+            log_mode=log_mode,
         )
         self.runs[run_id] = run
 
@@ -103,8 +427,43 @@ class GraphEngine:
             run.status = "error"
             run.error_message = str(exc)
 
+        if signature is not None and run.status == "completed":
+            self._run_cache[signature] = run
+
         return run
 
+    def _run_signature(
+        self,
+        graph: Graph,
+        initial_state: Dict[str, Any],
+        log_mode: str,
+    ) -> Optional[str]:
+        """
+        Hash of everything a run depends on: the graph, its initial state and
+        the log mode. Returns None when the run must not be memoized (a
+        non-cacheable tool or a state that is not JSON-serializable).
+        """
+        if not graph.cacheable:
+            return None
+        try:
+            payload = orjson.dumps(
+                [graph.graph_id, log_mode, initial_state],
+                option=orjson.OPT_SORT_KEYS,
+            )
+        except TypeError:
+            return None
+        return hashlib.blake2b(payload).hexdigest()
+
+    def _reuse_run(self, run: RunRecord) -> RunRecord:
+        """
+        Register a copy of a finished run under a fresh run_id. Finished runs
+        are never mutated again, so copying the containers is enough to keep
+        the copy independent of the original.
+        """
+        clone = replace(run, run_id=_new_id(), state=run.state.copy(), log=run.log.copy())
+        self.runs[clone.run_id] = clone
+        return clone
+
     def _execute_run(self, graph: Graph, run: RunRecord) -> None:
         """
         Core execution loop with basic branching + looping.
@@ -120,51 +479,134 @@ class GraphEngine:
               "on_false": "refine_summary"
            }
 
-        'end' or missing next node = stop.
-        """
-        max_steps = 1000  # safety for infinite loops
-        current = graph.start_node
-        steps = 0
-
-        while current and steps < max_steps:
-            run.current_node = current
-            tool = self.tool_registry.get(current)
+        3. Fan-out, then continue at "next":
+           {"fanout": ["node_a", "node_b"], "next": "join_node"}
 
-            # Execute node
-            new_state = tool(run.state) or {}
-            # Merge new keys into shared state
-            run.state.update(new_state)
+           The fan-out nodes all see the state left by this node, run
+           independently (see _run_fanout()) and must write disjoint keys.
+           Their own edges are not followed.
 
-            # Log snapshot after this node
-            run.log.append(NodeLogEntry(node=current, state=dict(run.state)))
+        'end' or missing next node = stop.
+        """
+        run_loop(self, graph, run, max_steps=1000)  # max_steps: safety for infinite loops
 
-            # Decide next node
-            edge_cfg = graph.edges.get(current, {})
-            next_node = self._resolve_next_node(edge_cfg, run.state)
+    def _call_tool(
+        self,
+        tool: ToolFunc,
+        node: str,
+        keys: Optional[Tuple[str, ...]],
+        state: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Call a tool, reusing an earlier output when the tool declared its
+        input keys and those keys hold the same values as before.
+        """
+        key = self._memo_key(node, keys, state)
+        if key is None:
+            return tool(state) or {}
 
-            if not next_node or next_node == "end":
-                break
+        output = self._node_cache.lookup(key)
+        if output is None:
+            output = tool(state) or {}
+            if self._is_memoizable(output, keys or (), state):
+                self._node_cache[key] = output
+        return output
 
-            current = next_node
-            steps += 1
+    @staticmethod
+    def _is_memoizable(
+        output: Dict[str, Any],
+        keys: Tuple[str, ...],
+        state: Dict[str, Any],
+    ) -> bool:
+        """
+        Whether output holds only keys the tool wrote. A key outside the
+        read set that still has its input value was copied through (e.g. by
+        returning the state itself); replaying it would overwrite a later
+        state with a stale value. A tool writing an unchanged value is
+        indistinguishable from that and just misses the cache.
+        """
+        if output is state:
+            return False
+        for name, value in output.items():
+            if name not in keys and name in state:
+                old = state[name]
+                if value is old or value == old:
+                    return False
+        return True
 
     @staticmethod
-    def _resolve_next_node(edge_cfg: Dict[str, Any], state: Dict[str, Any]) -> Optional[str]:
-        if not edge_cfg:
+    def _memo_key(
+        node: str,
+        keys: Optional[Tuple[str, ...]],
+        state: Dict[str, Any],
+    ) -> Optional[Tuple[str, bytes]]:
+        if keys is None:
             return None
+        try:
+            payload = orjson.dumps(
+                {k: state[k] for k in keys if k in state},
+                option=orjson.OPT_SORT_KEYS,
+            )
+        except TypeError:
+            return None
+        return (node, hashlib.blake2b(payload).digest())
 
-        # Conditional routing
-        condition_key = edge_cfg.get("condition_key")
-        if condition_key is not None:
-            flag = bool(state.get(condition_key))
-            return edge_cfg["on_true"] if flag else edge_cfg["on_false"]
-
-        # Simple linear edge
-        return edge_cfg.get("next")
+    def _run_fanout(self, graph: Graph, run: RunRecord, branches: Tuple[str, ...]) -> None:
+        """
+        Run independent branches against the same state snapshot and merge
+        their outputs. Cache misses go to self.executor when there is more
+        than one; raises ValueError if two branches write the same key.
+
+        A ProcessPoolExecutor pickles the whole snapshot once per branch, so
+        it only pays off when the branches cost more CPU than copying the
+        state to the workers. With a large state and cheap branches (or a
+        single CPU) running them serially is faster.
+        """
+        snapshot = run.state.copy()
+        memo_keys = {node: self._memo_key(node, graph.memo_keys[node], snapshot) for node in branches}
+
+        outputs: Dict[str, Dict[str, Any]] = {}
+        for node, key in memo_keys.items():
+            cached = self._node_cache.lookup(key) if key is not None else None
+            if cached is not None:
+                outputs[node] = cached
+        misses = [node for node in branches if node not in outputs]
+
+        # Each branch gets its own copy so in-place writes cannot leak across
+        if self.executor is not None and len(misses) > 1:
+            futures = [self.executor.submit(graph.compiled_tools[node], snapshot.copy()) for node in misses]
+            results = [future.result() for future in futures]
+        else:
+            results = [graph.compiled_tools[node](snapshot.copy()) for node in misses]
+
+        for node, result in zip(misses, results):
+            output = result or {}
+            key = memo_keys[node]
+            if key is not None and self._is_memoizable(output, graph.memo_keys[node] or (), snapshot):
+                self._node_cache[key] = output
+            outputs[node] = output
+
+        written: Set[str] = set()
+        for node in branches:
+            output = outputs[node]
+            clash = written & output.keys()
+            if clash:
+                raise ValueError(
+                    f"Fan-out node '{node}' writes keys already written by another branch: {sorted(clash)}"
+                )
+            written.update(output)
+
+        # Merge branch by branch so every log mode sees the same step order
+        log_step = run.step_logger()
+        for node in branches:
+            run.state.update(outputs[node])
+            if log_step is not None:
+                log_step(node, outputs[node])
 
     # -------- State inspection --------
 
     def get_run(self, run_id: str) -> RunRecord:
-        if run_id not in self.runs:
+        run = self.runs.lookup(run_id)
+        if run is None:
             raise KeyError(f"Run '{run_id}' not found")
-        return self.runs[run_id]
+        return run
@@ -1,6 +1,11 @@
-from typing import Any, Dict
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Type, TypeVar
 
-from fastapi import FastAPI, HTTPException
+import msgspec
+from fastapi import FastAPI, HTTPException, Request, Response
 
 from .engine import GraphEngine, ToolRegistry
 from .models import (
@@ -13,23 +18,109 @@ from .models import (
 from . import tools
 
 
-app = FastAPI(title="Minimal Agent Workflow Engine")
-
 # --- Tool registry and engine setup ---
 
 tool_registry = ToolRegistry()
 
 # Register tools for Option B workflow
-tool_registry.register("split_text", tools.split_text)
-tool_registry.register("generate_summaries", tools.generate_summaries)
-tool_registry.register("merge_summaries", tools.merge_summaries)
-tool_registry.register("refine_summary", tools.refine_summary)
+tool_registry.register(
+    "split_text",
+    tools.split_text,
+    input_keys=["text", "chunk_size"],
+)
+tool_registry.register(
+    "generate_summaries",
+    tools.generate_summaries,
+    input_keys=["chunks", "per_chunk_summary_words"],
+)
+tool_registry.register(
+    "merge_summaries",
+    tools.merge_summaries,
+    input_keys=["summaries"],
+)
+tool_registry.register(
+    "refine_summary",
+    tools.refine_summary,
+    input_keys=["draft_summary", "summary_limit_words"],
+)
+# Single-node alternative to generate_summaries -> merge_summaries -> refine_summary
+tool_registry.register(
+    "summarize_fused",
+    tools.summarize_fused,
+    input_keys=[
+        "chunks",
+        "text",
+        "chunk_size",
+        "per_chunk_summary_words",
+        "summary_limit_words",
+    ],
+)
+tool_registry.seal()
 
 engine = GraphEngine(tool_registry=tool_registry)
 
 
-@app.post("/graph/create", response_model=GraphCreateResponse)
-def create_graph(req: GraphCreateRequest) -> GraphCreateResponse:
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Fan-out branches are CPU-bound tools, so they run in worker processes.
+    # Workers are started lazily from a thread while other threads run, so
+    # avoid the default fork start method (it can deadlock on held locks).
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context(start_method),
+    ) as pool:
+        engine.executor = pool
+        try:
+            yield
+        finally:
+            engine.executor = None
+
+
+app = FastAPI(
+    title="Minimal Agent Workflow Engine",
+    lifespan=lifespan,
+)
+
+
+StructT = TypeVar("StructT", bound=msgspec.Struct)
+
+
+def _decode_body(body: bytes, struct_type: Type[StructT]) -> StructT:
+    try:
+        return msgspec.json.decode(body, type=struct_type)
+    except msgspec.DecodeError as e:  # includes msgspec.ValidationError
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+
+def _request_body_schema(struct_type: Type[msgspec.Struct]) -> Dict[str, Any]:
+    # Routes read the raw body, so the request schema is declared by hand.
+    schema = msgspec.json.schema(struct_type)["$defs"][struct_type.__name__]
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
+
+def _json_response(content: Dict[str, Any]) -> Response:
+    # Encoded with msgspec like the request bodies; unlike orjson it also
+    # handles integers beyond 64 bits, which the decoder accepts.
+    return Response(content=msgspec.json.encode(content), media_type="application/json")
+
+
+# Responses are built from trusted engine data, so routes skip
+# response_model validation; `responses=` keeps the OpenAPI schema.
+
+
+@app.post(
+    "/graph/create",
+    response_model=None,
+    responses={200: {"model": GraphCreateResponse}},
+    openapi_extra=_request_body_schema(GraphCreateRequest),
+)
+async def create_graph(request: Request) -> GraphCreateResponse:
     """
     Create a new graph definition.
 
@@ -49,20 +140,35 @@ def create_graph(req: GraphCreateRequest) -> GraphCreateResponse:
         }
       }
     }
+
+    The last three nodes can be replaced by the fused "summarize_fused"
+    node, which needs no refine loop:
+
+    {
+      "nodes": ["split_text", "summarize_fused"],
+      "start_node": "split_text",
+      "edges": {"split_text": {"next": "summarize_fused"}}
+    }
     """
+    req = _decode_body(await request.body(), GraphCreateRequest)
     try:
         graph_id = engine.create_graph(
             nodes=req.nodes,
             start_node=req.start_node,
             edges=req.edges,
         )
-        return GraphCreateResponse(graph_id=graph_id)
+        return GraphCreateResponse.model_construct(graph_id=graph_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
-@app.post("/graph/run", response_model=GraphRunResponse)
-def run_graph(req: GraphRunRequest) -> GraphRunResponse:
+@app.post(
+    "/graph/run",
+    response_model=None,
+    responses={200: {"model": GraphRunResponse}},
+    openapi_extra=_request_body_schema(GraphRunRequest),
+)
+async def run_graph(request: Request) -> Response:
     """
     Run a previously created graph with an initial state.
 
@@ -75,23 +181,34 @@ def run_graph(req: GraphRunRequest) -> GraphRunResponse:
         "chunk_size": 60,
         "per_chunk_summary_words": 25,
         "summary_limit_words": 120
-      }
+      },
+      "log_mode": "full"
     }
+
+    log_mode is "none" (default, empty log), "delta" or "full"; the
+    returned log always holds the full state after each step.
     """
+    req = _decode_body(await request.body(), GraphRunRequest)
     try:
-        run = engine.run_graph(req.graph_id, req.initial_state)
+        run = await engine.arun_graph(req.graph_id, req.initial_state, req.log_mode)
     except KeyError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
 
-    return GraphRunResponse(
-        run_id=run.run_id,
-        final_state=run.state,
-        log=run.log,
+    return _json_response(
+        {
+            "run_id": run.run_id,
+            "final_state": run.state,
+            "log": run.log_snapshots(),
+        }
     )
 
 
-@app.get("/graph/state/{run_id}", response_model=RunStateResponse)
-def get_run_state(run_id: str) -> RunStateResponse:
+@app.get(
+    "/graph/state/{run_id}",
+    response_model=None,
+    responses={200: {"model": RunStateResponse}},
+)
+async def get_run_state(run_id: str) -> Response:
     """
     Get current or final state of a workflow run.
     """
@@ -100,17 +217,19 @@ def get_run_state(run_id: str) -> RunStateResponse:
     except KeyError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
 
-    return RunStateResponse(
-        run_id=run.run_id,
-        status=run.status,
-        current_node=run.current_node,
-        state=run.state,
-        log=run.log,
+    return _json_response(
+        {
+            "run_id": run.run_id,
+            "status": run.status,
+            "current_node": run.current_node,
+            "state": run.state,
+            "log": run.log_snapshots(),
+        }
     )
 
 
 @app.get("/")
-def root() -> Dict[str, Any]:
+async def root() -> Dict[str, Any]:
     return {"message": "Minimal agent workflow engine is running."}
 if __name__ == "__main__":
     import uvicorn
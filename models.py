@@ -1,8 +1,14 @@
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
 
+import msgspec
+from pydantic import BaseModel
 
-class GraphCreateRequest(BaseModel):
+
+# Request bodies are msgspec Structs, decoded by the routes themselves;
+# responses stay pydantic models for the OpenAPI schema.
+
+
+class GraphCreateRequest(msgspec.Struct):
     """
     Request body for /graph/create
     """
@@ -15,12 +21,14 @@ class GraphCreateResponse(BaseModel):
     graph_id: str
 
 
-class GraphRunRequest(BaseModel):
+class GraphRunRequest(msgspec.Struct):
     """
     Request body for /graph/run
     """
     graph_id: str
-    initial_state: Dict[str, Any] = Field(default_factory=dict)
+    initial_state: Dict[str, Any] = msgspec.field(default_factory=dict)
+    # What the run log keeps: nothing, per-step deltas or full snapshots
+    log_mode: Literal["none", "delta", "full"] = "none"
 
 
 class NodeLogEntry(BaseModel):
@@ -1,12 +1,59 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+try:
+    import numpy as np
 
-def _simple_chunk_text(text: str, chunk_size: int) -> List[str]:
+    _HAS_NUMPY = True
+except ImportError:  # optional: only speeds up split_text on large inputs
+    _HAS_NUMPY = False
+
+
+# Measured crossover: below about 4 KB of text the NumPy setup costs more
+# than the pure-Python split.
+_NUMPY_MIN_TEXT_LEN = 4096
+
+
+def _simple_chunk_words(text: str, chunk_size: int) -> List[List[str]]:
     words = text.split()
-    chunks: List[str] = []
-    for i in range(0, len(words), chunk_size):
-        chunks.append(" ".join(words[i : i + chunk_size]))
-    return chunks
+    return [words[i : i + chunk_size] for i in range(0, len(words), chunk_size)]
+
+
+def _chunk_text_numpy(text: str, chunk_size: int) -> Optional[List[str]]:
+    """
+    Same result as the pure-Python path for ASCII text whose words are
+    separated by single spaces, with the word boundaries found in C: every
+    chunk_size-th space becomes a cut point. Returns None for any other
+    whitespace, where collapsing the runs in NumPy is not faster.
+    """
+    buf = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    # Other str.split() whitespace in ASCII: 0x09-0x0D and 0x1C-0x1F (uint8 wraps)
+    if ((buf - np.uint8(0x09)) <= 4).any() or ((buf - np.uint8(0x1C)) <= 3).any():
+        return None
+    is_space = buf == 0x20
+    if is_space[0] or (is_space[1:] & is_space[:-1]).any():
+        return None
+
+    stop = buf.size - 1 if is_space[-1] else buf.size
+    cuts = np.flatnonzero(is_space[:stop])[chunk_size - 1 :: chunk_size]
+    starts = [0, *(cuts + 1).tolist()]
+    ends = [*cuts.tolist(), stop]
+    return [text[start:end] for start, end in zip(starts, ends)]
+
+
+def _simple_chunk_text(text: str, chunk_size: int) -> List[str]:
+    if (
+        _HAS_NUMPY
+        and chunk_size > 0
+        and len(text) >= _NUMPY_MIN_TEXT_LEN
+        and text.isascii()
+        # Cheap rejects for paragraph or tab separated text
+        and "\n" not in text
+        and "\t" not in text
+    ):
+        chunks = _chunk_text_numpy(text, chunk_size)
+        if chunks is not None:
+            return chunks
+    return [" ".join(chunk) for chunk in _simple_chunk_words(text, chunk_size)]
 
 
 def split_text(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -42,10 +89,8 @@ def generate_summaries(state: Dict[str, Any]) -> Dict[str, Any]:
     chunks = state.get("chunks", [])
     max_words = int(state.get("per_chunk_summary_words", 20))
 
-    summaries: List[str] = []
-    for chunk in chunks:
-        words = chunk.split()
-        summaries.append(" ".join(words[:max_words]))
+    # maxsplit stops splitting once the words we keep are found
+    summaries = [" ".join(chunk.split(None, max_words)[:max_words]) for chunk in chunks]
     return {"summaries": summaries}
 
 
@@ -75,30 +120,53 @@ def refine_summary(state: Dict[str, Any]) -> Dict[str, Any]:
     draft = state.get("draft_summary", "")
     limit = state.get("summary_limit_words", 40)
 
-    # Split into words
+    # Split once; reused for the limit check
     words = draft.split()
-
-    # Apply limit
     final_summary = " ".join(words[:limit])
-
-    # check if final summary fits
     is_short_enough = len(words) <= limit
 
-    # Save into state
-    state["final_summary"] = final_summary
-    state["is_summary_short_enough"] = is_short_enough
-
-    # clean final state format
-    state = {
-        "text": state.get("text"),
-        "chunk_size": state.get("chunk_size"),
-        "per_chunk_summary_words": state.get("per_chunk_summary_words"),
-        "summary_limit_words": state.get("summary_limit_words"),
+    # Only the written keys; the engine merges them into the shared state
+    return {
         "final_summary": final_summary,
         "is_summary_short_enough": is_short_enough,
-        "chunks": state.get("chunks"),
-        "summaries": state.get("summaries"),
-        "draft_summary": draft
+        "draft_summary": draft,
     }
 
-    return state
+
+def summarize_fused(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Nodes 2-4 fused: summarize, merge and apply the word limit in one pass.
+
+    Streams each chunk's first N words into the output and stops once the
+    word limit is reached, so no summaries list or draft string is built.
+    The result is always within the limit, so a refine_summary self-loop
+    is not needed after this node.
+
+    Expects:
+      state["chunks"]: List[str] (optional, else state["text"] is chunked
+        with state["chunk_size"] like split_text)
+      state["per_chunk_summary_words"]: int (optional, default=20)
+      state["summary_limit_words"]: int (optional, default=40)
+
+    Produces:
+      state["final_summary"]: str
+      state["is_summary_short_enough"]: bool (always True)
+    """
+    per_chunk = int(state.get("per_chunk_summary_words", 20))
+    limit = int(state.get("summary_limit_words", 40))
+
+    chunks = state.get("chunks")
+    if chunks is None:
+        words = state.get("text", "").split()
+        chunk_size = int(state.get("chunk_size", 50))
+        chunk_words = (words[i : i + chunk_size] for i in range(0, len(words), chunk_size))
+    else:
+        chunk_words = (chunk.split(None, per_chunk) for chunk in chunks)
+
+    out: List[str] = []
+    for words_in_chunk in chunk_words:
+        if len(out) >= limit:
+            break
+        out.extend(words_in_chunk[:per_chunk])
+
+    return {"final_summary": " ".join(out[:limit]), "is_summary_short_enough": True}